@@ -1,13 +1,15 @@
 import argparse
+import sys
 import uvicorn # type: ignore
 from starlette.applications import Starlette # type: ignore
 from starlette.routing import Mount, Route # type: ignore
 from mcp.server import Server # type: ignore
 from mcp.server.sse import SseServerTransport # type: ignore
 from starlette.requests import Request # type: ignore
+from starlette.responses import Response # type: ignore
 
 # Import the main mcp instance from app.modules
-from app.modules import mcp, connect_to_plex
+from app.modules import mcp
 
 # Import all tools to ensure they are registered with MCP
 # Library module functions
@@ -85,11 +87,16 @@ from app.modules.client import (
     client_set_streams
 )
 
+# Transports accepted by --transport
+TRANSPORTS = ("stdio", "sse")
+
 def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlette:
     """Create a Starlette application that can serve the provided mcp server with SSE."""
     sse = SseServerTransport("/messages/")
 
-    async def handle_sse(request: Request) -> None:
+    async def handle_sse(request: Request) -> Response:
+        # connect_sse streams through sse-starlette's async EventSourceResponse,
+        # so the session runs directly on the event loop with no threadpool hop.
         async with sse.connect_sse(
             request.scope,
             request.receive,
@@ -100,19 +107,31 @@ def create_starlette_app(mcp_server: Server, *, debug: bool = False) -> Starlett
                 write_stream,
                 mcp_server.create_initialization_options(),
             )
+        # The SSE response has already been sent; return an empty one so
+        # Starlette doesn't fail calling None once the client disconnects.
+        return Response()
 
     return Starlette(
         debug=debug,
         routes=[
-            Route("/sse", endpoint=handle_sse),
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
             Mount("/messages/", app=sse.handle_post_message),
         ],
     )
 
+def build_asgi_app(debug: bool = False) -> Starlette:
+    """ASGI application factory for running the SSE server under an external launcher.
+    
+    e.g. ``uvicorn app:build_asgi_app --factory``. Keep to a single worker: the SSE
+    transport tracks sessions in-process, so /messages/ posts must reach the worker
+    that holds the matching /sse stream.
+    """
+    return create_starlette_app(mcp._mcp_server, debug=debug)
+
 def run():
     # Setup command line arguments
     parser = argparse.ArgumentParser(description='Run Plex MCP Server')
-    parser.add_argument('--transport', choices=['stdio', 'sse'], default='sse', 
+    parser.add_argument('--transport', choices=TRANSPORTS, default='sse',
                         help='Transport method to use (stdio or sse)')
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to (for SSE)')
     parser.add_argument('--port', type=int, default=3001, help='Port to listen on (for SSE)')
@@ -120,20 +139,31 @@ def run():
     
     args = parser.parse_args()
     
-    # Initialize and run the server
-    print(f"Starting Plex MCP Server with {args.transport} transport...")
-    print("Set PLEX_URL and PLEX_TOKEN environment variables for connection")
+    # Initialize and run the server. Banners go to stderr: with the stdio
+    # transport stdout is the protocol stream and must only carry MCP messages.
+    print(f"Starting Plex MCP Server with {args.transport} transport...\n"
+          "Set PLEX_URL and PLEX_TOKEN environment variables for connection", file=sys.stderr)
     
     if args.transport == 'stdio':
         # Run with stdio transport (original method)
         mcp.run(transport='stdio')
     else:
         # Run with SSE transport
-        mcp_server = mcp._mcp_server  # Access the underlying MCP server
-        starlette_app = create_starlette_app(mcp_server, debug=args.debug)
-        print(f"Starting SSE server on http://{args.host}:{args.port}")
-        print("Access the SSE endpoint at /sse")
-        uvicorn.run(starlette_app, host=args.host, port=args.port)
+        starlette_app = build_asgi_app(debug=args.debug)
+        print(f"Starting SSE server on http://{args.host}:{args.port}\n"
+              "Access the SSE endpoint at /sse", file=sys.stderr)
+        # loop/http stay on "auto", which picks uvloop and httptools from
+        # uvicorn[standard] and falls back to asyncio and h11 without them
+        config = uvicorn.Config(
+            starlette_app,
+            host=args.host,
+            port=args.port,
+            interface="asgi3",
+            log_level="debug" if args.debug else "info",
+            access_log=args.debug,
+            proxy_headers=True,
+        )
+        uvicorn.Server(config).run()
 
 if __name__ == "__main__":
     run()
\ No newline at end of file
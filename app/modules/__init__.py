@@ -1,18 +1,24 @@
+import asyncio
+import functools
 import os
+import sys
 import time
+import requests
+from requests.adapters import HTTPAdapter
 from mcp.server.fastmcp import FastMCP # type: ignore
 from plexapi.server import PlexServer # type: ignore
 from plexapi.myplex import MyPlexAccount # type: ignore
 
-# Add dotenv for .env file support
+# Add dotenv for .env file support. Status messages go to stderr since stdout
+# carries the MCP protocol stream when running with the stdio transport.
 try:
     from dotenv import load_dotenv # type: ignore
     # Load environment variables from .env file
     load_dotenv()
-    print("Successfully loaded environment variables from .env file")
+    print("Successfully loaded environment variables from .env file", file=sys.stderr)
 except ImportError:
-    print("Warning: python-dotenv not installed. Environment variables won't be loaded from .env file.")
-    print("Install with: pip install python-dotenv")
+    print("Warning: python-dotenv not installed. Environment variables won't be loaded from .env file.\n"
+          "Install with: pip install python-dotenv", file=sys.stderr)
 
 # Initialize FastMCP server
 mcp = FastMCP("plex-server")
@@ -25,6 +31,13 @@ last_connection_time = 0
 CONNECTION_TIMEOUT = 30  # seconds
 SESSION_TIMEOUT = 60 * 30  # 30 minutes
 
+# Shared HTTP session for every Plex connection so reconnects and concurrent
+# tool calls reuse pooled keep-alive connections instead of new TCP/TLS handshakes
+http_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50)
+http_session.mount("http://", _adapter)
+http_session.mount("https://", _adapter)
+
 def connect_to_plex() -> PlexServer:
     """Connect to Plex server using environment variables or stored credentials.
     
@@ -55,7 +68,7 @@ def connect_to_plex() -> PlexServer:
         try:
             # Try connecting directly with a token
             if plex_token:
-                server = PlexServer(plex_url, plex_token, timeout=CONNECTION_TIMEOUT)
+                server = PlexServer(plex_url, plex_token, session=http_session, timeout=CONNECTION_TIMEOUT)
                 last_connection_time = current_time
                 return server
             
@@ -65,7 +78,7 @@ def connect_to_plex() -> PlexServer:
             server_name = os.environ.get("PLEX_SERVER_NAME")
             
             if username and password and server_name:
-                account = MyPlexAccount(username, password)
+                account = MyPlexAccount(username, password, session=http_session)
                 # Use the plex_token if available to avoid resource.connect()
                 # which can be problematic
                 for resource in account.resources():
@@ -74,7 +87,7 @@ def connect_to_plex() -> PlexServer:
                             # Try each connection until one works
                             for connection in resource.connections:
                                 try:
-                                    server = PlexServer(connection.uri, account.authenticationToken, timeout=CONNECTION_TIMEOUT)
+                                    server = PlexServer(connection.uri, account.authenticationToken, session=http_session, timeout=CONNECTION_TIMEOUT)
                                     last_connection_time = current_time
                                     return server
                                 except:
@@ -97,3 +110,112 @@ def connect_to_plex() -> PlexServer:
     
     # We shouldn't get here but just in case
     raise ValueError("Failed to connect to Plex server")
+
+# Connection shared by async tools; the lock makes concurrent first calls
+# connect once instead of each running connect_to_plex()
+_plex = None
+_plex_checked_at = 0.0
+_plex_lock = asyncio.Lock()
+
+# Seconds get_plex() trusts the shared connection before checking it again,
+# and seconds to wait after each consecutive failure before trying again
+PLEX_CONNECTION_TTL = 5 * 60
+_PLEX_RETRY_BACKOFF = (0.5, 1, 2)
+_plex_failures = 0
+_plex_retry_at = 0.0
+_plex_error = None
+
+async def get_plex() -> PlexServer:
+    """Return the shared Plex connection, connecting off the event loop when needed.
+    
+    An established connection is reused without a liveness check for
+    PLEX_CONNECTION_TTL seconds; after that connect_to_plex() verifies it and
+    reconnects if it went stale. Call reset_plex() when a request fails to
+    reach the server so the next call reconnects.
+    
+    After a failed attempt, calls within the backoff window fail straight
+    away with the same error instead of each retrying the connection.
+    """
+    global _plex, _plex_checked_at, _plex_failures, _plex_retry_at, _plex_error
+    async with _plex_lock:
+        now = time.monotonic()
+        if _plex is not None and now - _plex_checked_at < PLEX_CONNECTION_TTL:
+            return _plex
+        if _plex_error is not None and now < _plex_retry_at:
+            raise ValueError(_plex_error)
+        
+        try:
+            _plex = await asyncio.to_thread(connect_to_plex)
+        except Exception as e:
+            _plex = None
+            _plex_error = str(e)
+            _plex_retry_at = time.monotonic() + _PLEX_RETRY_BACKOFF[min(_plex_failures, len(_PLEX_RETRY_BACKOFF) - 1)]
+            _plex_failures += 1
+            raise
+        
+        _plex_failures, _plex_error = 0, None
+        _plex_checked_at = time.monotonic()
+        return _plex
+
+def reset_plex() -> None:
+    """Forget the shared Plex connection so the next get_plex() reconnects."""
+    global _plex
+    _plex = None
+
+def ttl_cache(ttl: float, maxsize: int = 128):
+    """Cache the results of a coroutine function for ``ttl`` seconds.
+    
+    Results are keyed on the call arguments, which must be hashable. Misses
+    are fetched under a lock and the cache is checked again once it's held,
+    so concurrent callers that miss together share one fetch. Exceptions are
+    never cached, so a failed fetch is retried on the next call. The
+    decorated function gains a ``cache_clear()`` method to drop stale results,
+    including any fetch still in flight.
+    """
+    def decorator(func):
+        cache = {}  # key -> (expires_at, value)
+        lock = asyncio.Lock()
+        generation = 0  # bumped by cache_clear() so in-flight fetches aren't stored
+        
+        def lookup(key):
+            entry = cache.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry
+            return None
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            entry = lookup(key)
+            if entry is not None:
+                return entry[1]
+            
+            async with lock:
+                # Another caller may have fetched it while we waited
+                entry = lookup(key)
+                if entry is not None:
+                    return entry[1]
+                
+                fetched_in = generation
+                value = await func(*args, **kwargs)
+                if fetched_in != generation:
+                    return value
+                
+                now = time.monotonic()
+                if key not in cache and len(cache) >= maxsize:
+                    # Drop expired entries first, then the oldest if still full
+                    for stale in [k for k, (expires_at, _) in cache.items() if expires_at <= now]:
+                        del cache[stale]
+                    if len(cache) >= maxsize:
+                        del cache[next(iter(cache))]
+                cache[key] = (now + ttl, value)
+                return value
+        
+        def cache_clear():
+            nonlocal generation
+            generation += 1
+            cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
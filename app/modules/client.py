@@ -2,44 +2,416 @@
 Client-related functions for Plex Media Server.
 Provides tools to connect to clients and control media playback.
 """
+import asyncio
 import json
-import time
-from typing import List, Dict, Optional, Union, Any
+from itertools import chain
+from xml.etree.ElementTree import ParseError
 
-from app.modules import mcp, connect_to_plex
-from plexapi.exceptions import NotFound, Unauthorized
+from requests.exceptions import RequestException
+from app.modules import mcp, get_plex, reset_plex, ttl_cache
+from plexapi.client import ClientTimeline, PlexClient # type: ignore
+from plexapi.exceptions import PlexApiException, Unauthorized # type: ignore
+
+# (attribute, default) pairs reported for each client by the listing and detail tools
+_CLIENT_LIST_FIELDS = (
+    ("device", "Unknown"),
+    ("model", "Unknown"),
+    ("product", "Unknown"),
+    ("version", "Unknown"),
+    ("platform", "Unknown"),
+    ("state", "Unknown"),
+    ("machineIdentifier", "Unknown"),
+    ("protocolCapabilities", []),
+)
+_CLIENT_DETAIL_FIELDS = (
+    ("device", "Unknown"),
+    ("deviceClass", "Unknown"),
+    ("model", "Unknown"),
+    ("product", "Unknown"),
+    ("version", "Unknown"),
+    ("platform", "Unknown"),
+    ("platformVersion", "Unknown"),
+    ("state", "Unknown"),
+    ("machineIdentifier", "Unknown"),
+    ("protocolCapabilities", []),
+    ("local", "Unknown"),
+    ("protocol", "plex"),
+    ("protocolVersion", "Unknown"),
+    ("vendor", "Unknown"),
+)
+_ACTIVE_PLAYER_FIELDS = (
+    ("device", "Unknown"),
+    ("product", "Unknown"),
+    ("platform", "Unknown"),
+    ("state", "Unknown"),
+)
+
+def _client_fields(client, fields) -> dict:
+    """Read (attribute, default) pairs from a client.
+    
+    PlexClient stores everything parsed from the server as plain instance
+    attributes, so one pass over its __dict__ replaces a getattr per field.
+    """
+    attrs = client.__dict__
+    return {key: attrs.get(key, default) for key, default in fields}
+
+def _client_info(client, fields) -> dict:
+    """Build a client's info dict from its name, the given fields and its address."""
+    attrs = client.__dict__
+    return {
+        "name": client.title,
+        **_client_fields(client, fields),
+        "address": attrs.get("_baseurl") or attrs.get("address", "Unknown"),
+    }
+
+# Errors raised by a client that doesn't answer timeline requests: an error
+# response, a failed or timed-out connection, or a malformed reply
+_TIMELINE_ERRORS = (PlexApiException, RequestException, ParseError)
+
+# Seconds to reuse a fetched client/session list, so a burst of tool calls
+# (e.g. list clients, then get details) shares one round trip per list
+CLIENT_CACHE_TTL = 3
+
+async def _fetch(fetch):
+    """Run a blocking server request off the event loop, dropping the shared
+    connection if the server can't be reached so the next tool call reconnects."""
+    try:
+        return await asyncio.to_thread(fetch)
+    except (RequestException, Unauthorized):
+        # The server is unreachable or the token was revoked
+        reset_plex()
+        raise
+
+@ttl_cache(CLIENT_CACHE_TTL, maxsize=4)
+async def get_clients(plex):
+    """Fetch the clients connected to the server, off the event loop."""
+    return await _fetch(plex.clients)
+
+@ttl_cache(CLIENT_CACHE_TTL, maxsize=4)
+async def get_sessions(plex):
+    """Fetch the server's active playback sessions, off the event loop."""
+    return await _fetch(plex.sessions)
+
+def invalidate_client_cache():
+    """Drop cached clients and sessions once a tool has changed playback state."""
+    get_clients.cache_clear()
+    get_sessions.cache_clear()
+
+def _find_client(client_name, clients):
+    """Find a client by exact name or machine identifier, falling back to the
+    first client whose machine identifier starts with ``client_name`` or whose
+    name contains it (case-insensitive).
+    
+    Machine identifiers are only prefix-matched, never substring-matched, so
+    a shortened identifier works without matching unrelated clients.
+    
+    Works on an already-fetched client list, unlike plex.client() which
+    requests /clients from the server again on every lookup.
+    """
+    client = next((c for c in clients if c.title == client_name or c.machineIdentifier == client_name), None)
+    if client is None and client_name:
+        needle = client_name.lower()
+        client = next((
+            c for c in clients
+            if (c.machineIdentifier and c.machineIdentifier.startswith(client_name))
+            or (c.title and needle in c.title.lower())
+        ), None)
+    return client
+
+def _session_players(sessions) -> list:
+    """Return the players of the sessions that have one, in session order."""
+    return [session.player for session in sessions if getattr(session, 'player', None)]
+
+async def _find_server_client(plex, client_name):
+    """Find a client among the server's clients, falling back to session players.
+    
+    Sessions are only fetched when the client isn't a regular client, which
+    saves a round trip in the common case.
+    """
+    client = _find_client(client_name, await get_clients(plex))
+    if client is None:
+        client = _find_client(client_name, _session_players(await get_sessions(plex)))
+    return client
+
+def _session_player_id(session):
+    """Return the machine identifier of the player a session is playing on, if any."""
+    return getattr(getattr(session, 'player', None), 'machineIdentifier', None)
+
+def _sessions_by_player(sessions) -> dict:
+    """Index sessions by the machine identifier of the player they're playing on."""
+    return {
+        player_id: session
+        for session in sessions
+        if (player_id := _session_player_id(session))
+    }
+
+def _session_timeline(session) -> dict:
+    """Summarise a session's playback state as timeline data."""
+    view_offset = getattr(session, 'viewOffset', 0)
+    duration = getattr(session, 'duration', 0)
+    return {
+        "state": getattr(session.player, 'state', "Unknown"),
+        "time": view_offset,
+        "duration": duration,
+        "progress": round(view_offset / duration * 100, 2) if view_offset and duration else 0,
+        "title": getattr(session, 'title', "Unknown"),
+        "type": getattr(session, 'type', "Unknown"),
+    }
+
+# Timeline state each transport action should leave the client in
+_ACTION_STATES = {"play": "playing", "pause": "paused", "stop": "stopped"}
+
+# Actions that move to another item, confirmed by the timeline's item changing
+# from what it was before the command. Steps aren't listed: their position
+# change can't be told apart from normal playback, so they get the fixed wait.
+_SKIP_ACTIONS = frozenset({'skipNext', 'skipPrevious'})
+
+# Actions _action_confirmation() can confirm from the timeline
+_CONFIRMABLE_ACTIONS = frozenset({*_ACTION_STATES, *_SKIP_ACTIONS, 'seekTo', 'seekForward', 'seekBack', 'setVolume'})
+
+# Hard cap in seconds on waiting for a client to report a playback change,
+# the first poll interval (doubled after each poll, up to the max interval),
+# how close in ms a seek must land, and how long to wait before reporting the
+# timeline after an action the timeline can't confirm (e.g. mute)
+STATE_CHANGE_TIMEOUT = 2.0
+_STATE_POLL_INTERVAL = 0.05
+_STATE_POLL_MAX_INTERVAL = 0.2
+_SEEK_TOLERANCE_MS = 500
+_UNCONFIRMED_WAIT = 0.5
+
+# Seconds each client (by machine identifier) takes to confirm a command, as
+# a moving average of measured confirmations. Clients get twice their
+# estimate to confirm, but never less than the default, so fast clients
+# aren't waited on for as long as slow ones; clients not yet measured start
+# from the default.
+_CLIENT_ACK_LATENCY = {}
+_DEFAULT_ACK_LATENCY = 0.5
+_ACK_LATENCY_ALPHA = 0.2
+
+def _record_ack_latency(client_id, latency):
+    """Fold a measured confirmation latency into the client's moving average."""
+    previous = _CLIENT_ACK_LATENCY.get(client_id, _DEFAULT_ACK_LATENCY)
+    _CLIENT_ACK_LATENCY[client_id] = previous + _ACK_LATENCY_ALPHA * (latency - previous)
+
+def _poll_timeline(client):
+    """Fetch the client's active timeline with a fresh timeline poll.
+    
+    client.timeline goes through plexapi's one-second timeline cache, which is
+    shared by every tool call holding the same cached client. This sends the
+    poll directly and picks the active timeline the same way, leaving that
+    cache alone.
+    """
+    timelines = client.sendCommand(ClientTimeline.key, wait=0) or []
+    return next((timeline for timeline in (ClientTimeline(client, data) for data in timelines)
+                 if timeline.state != 'stopped'), None)
+
+def _timeline_item(timeline):
+    """Identify the item a timeline is on by its ratingKey and play queue item."""
+    return (timeline.ratingKey, timeline.playQueueItemID)
+
+def _action_confirmation(action, parameter, target_time, before):
+    """Build a check that a timeline reflects a playback action.
+    
+    Args:
+        action: Playback action that was sent
+        parameter: The action's parameter
+        target_time: Position in ms a seek targets, or None for other actions
+        before: The client's active timeline from before the command, or None
+    
+    Returns:
+        A function taking a timeline (or None) and returning whether the action
+        shows in it, or None if the timeline can't confirm this action
+    """
+    if action in _ACTION_STATES:
+        state = _ACTION_STATES[action]
+        if state == "stopped":
+            # Stopped timelines aren't reported as the active timeline
+            return lambda timeline: timeline is None or timeline.state == "stopped"
+        return lambda timeline: timeline is not None and timeline.state == state
+    if target_time is not None:
+        return lambda timeline: (timeline is not None and timeline.time is not None
+                                 and abs(timeline.time - target_time) < _SEEK_TOLERANCE_MS)
+    if action == 'setVolume':
+        return lambda timeline: timeline is not None and timeline.volume == parameter
+    if action in _SKIP_ACTIONS and before is not None:
+        before_item = _timeline_item(before)
+        return lambda timeline: timeline is not None and _timeline_item(timeline) != before_item
+    return None
+
+async def _await_state_change(client, confirmed=None, measure=True):
+    """Poll a client's timeline until it shows a playback action took effect.
+    
+    Polls back off exponentially from 50 ms, so the result comes back as soon
+    as the client catches up rather than after a fixed delay. The wait is
+    bounded by twice the client's measured confirmation latency, between
+    _DEFAULT_ACK_LATENCY and STATE_CHANGE_TIMEOUT. Actions the timeline can't
+    confirm get a fixed wait before the timeline is read.
+    
+    Args:
+        client: Client a playback command was just sent to
+        confirmed: Check from _action_confirmation(), or None if the action
+            can't be confirmed from the timeline
+        measure: Whether this wait measures the client's latency. Only true
+            when the timeline had to change, not for e.g. play while playing.
+    
+    Returns:
+        The last timeline fetched, or None if the client has no active timeline
+        or didn't respond
+    """
+    loop = asyncio.get_running_loop()
+    if confirmed is None:
+        await asyncio.sleep(_UNCONFIRMED_WAIT)
+        try:
+            return await asyncio.wait_for(asyncio.to_thread(_poll_timeline, client), STATE_CHANGE_TIMEOUT)
+        except (TimeoutError, *_TIMELINE_ERRORS):
+            return None
+    
+    started = loop.time()
+    client_id = client.machineIdentifier
+    estimate = _CLIENT_ACK_LATENCY.get(client_id, _DEFAULT_ACK_LATENCY)
+    timeout = min(max(2 * estimate, _DEFAULT_ACK_LATENCY), STATE_CHANGE_TIMEOUT)
+    deadline = started + timeout
+    delay = _STATE_POLL_INTERVAL
+    timeline = None
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            if measure:
+                # Unconfirmed in time; allow this client longer next time
+                _record_ack_latency(client_id, timeout)
+            return timeline
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, _STATE_POLL_MAX_INTERVAL)
+        try:
+            timeline = await asyncio.wait_for(
+                asyncio.to_thread(_poll_timeline, client),
+                max(deadline - loop.time(), _STATE_POLL_INTERVAL),
+            )
+        except (TimeoutError, *_TIMELINE_ERRORS):
+            return timeline
+        if confirmed(timeline):
+            if measure:
+                _record_ack_latency(client_id, loop.time() - started)
+            return timeline
+
+async def _is_client_active(plex, client) -> bool:
+    """Check whether a client is playing, from its timeline or else its session.
+    
+    Sessions are only fetched when the timeline doesn't show playback, e.g.
+    when the client doesn't answer timeline requests.
+    """
+    try:
+        timeline = await asyncio.to_thread(getattr, client, 'timeline')
+    except _TIMELINE_ERRORS:
+        timeline = None
+    if getattr(timeline, 'state', None) == 'playing':
+        return True
+    client_id = getattr(client, 'machineIdentifier', None)
+    if client_id is None:
+        return False
+    return any(_session_player_id(session) == client_id for session in await get_sessions(plex))
+
+def _client_command(method, with_parameter=False):
+    """Build a dispatch entry that calls a client method, optionally passing the action parameter."""
+    def command(client, parameter):
+        if with_parameter:
+            getattr(client, method)(parameter)
+        else:
+            getattr(client, method)()
+    return command
+
+def _seek_to(client, position):
+    """Seek to a position in ms and return it as the position to confirm."""
+    client.seekTo(position)
+    return position
+
+def _seek_by(client, offset):
+    """Seek relative to the client's current position in ms and return the target position."""
+    return _seek_to(client, max(0, _poll_timeline(client).time + offset))
+
+# Responses for argument errors that don't depend on the call, encoded once
+_ERR_VOLUME_RANGE = json.dumps({
+    "status": "error",
+    "message": "Volume must be between 0 and 100"
+})
+_ERR_NO_STREAM_IDS = json.dumps({
+    "status": "error",
+    "message": "At least one stream ID (audio, subtitle, or video) must be provided."
+})
+
+# Playback actions and the calls that perform them. Each entry takes the
+# client and the action parameter; seeks return the position they target so
+# the result can be confirmed against the timeline. Seek offsets default to 30s.
+_PLAYBACK_DISPATCH = {
+    # Transport controls
+    'play': _client_command('play'),
+    'pause': _client_command('pause'),
+    'stop': _client_command('stop'),
+    'skipNext': _client_command('skipNext'),
+    'skipPrevious': _client_command('skipPrevious'),
+    'stepForward': _client_command('stepForward'),
+    'stepBack': _client_command('stepBack'),
+    # Seeking
+    'seekTo': _seek_to,
+    'seekForward': lambda client, seconds: _seek_by(client, (30 if seconds is None else seconds) * 1000),
+    'seekBack': lambda client, seconds: _seek_by(client, -(30 if seconds is None else seconds) * 1000),
+    # Volume controls
+    'mute': _client_command('mute'),
+    'unmute': _client_command('unmute'),
+    'setVolume': _client_command('setVolume', with_parameter=True),
+}
+
+# Navigation actions and the client methods that perform them
+_NAV_DISPATCH = {
+    'moveUp': PlexClient.moveUp,
+    'moveDown': PlexClient.moveDown,
+    'moveLeft': PlexClient.moveLeft,
+    'moveRight': PlexClient.moveRight,
+    'select': PlexClient.select,
+    'back': PlexClient.goBack,
+    'home': PlexClient.goToHome,
+    'contextMenu': PlexClient.contextMenu,
+}
+
+# Argument checks for the control tools, with the lists quoted in their
+# error messages joined once
+_PLAYBACK_ACTIONS_STR = ", ".join(_PLAYBACK_DISPATCH)
+_NAV_ACTIONS_STR = ", ".join(_NAV_DISPATCH)
+_ACTIONS_NEEDING_PARAMETER = frozenset({'seekTo', 'setVolume'})
+_MEDIA_TYPES = ('video', 'music', 'photo')
+_VALID_MEDIA_TYPES = frozenset(_MEDIA_TYPES)
+_VALID_MEDIA_TYPES_STR = ", ".join(_MEDIA_TYPES)
 
 @mcp.tool()
 async def client_list(include_details: bool = True) -> str:
     """List all available Plex clients connected to the server.
     
     Args:
-        include_details: Whether to include detailed information about each client
+        include_details: Whether to include detailed information about each client.
+            Players only visible through active sessions are included only
+            when this is set.
     
     Returns:
         List of client names or detailed info dictionaries
     """
     try:
-        plex = connect_to_plex()
-        clients = plex.clients()
-        
-        # Also get session clients which may not appear in clients()
-        sessions = plex.sessions()
-        session_clients = []
-        
-        # Extract clients from sessions
-        for session in sessions:
-            if hasattr(session, 'player') and session.player:
-                session_clients.append(session.player)
+        plex = await get_plex()
         
-        # Combine both client lists, avoiding duplicates
-        all_clients = clients.copy()
-        client_ids = {client.machineIdentifier for client in clients}
-        
-        for client in session_clients:
-            if hasattr(client, 'machineIdentifier') and client.machineIdentifier not in client_ids:
-                all_clients.append(client)
-                client_ids.add(client.machineIdentifier)
+        if include_details:
+            # Also get session clients which may not appear in clients(); both
+            # requests run concurrently off the event loop
+            clients, sessions = await asyncio.gather(get_clients(plex), get_sessions(plex))
+            session_clients = _session_players(sessions)
+            
+            # Combine both client lists in one pass, keeping the first client seen per machine identifier
+            seen_ids = set()
+            all_clients = [
+                client for client in chain(clients, session_clients)
+                if not (client.machineIdentifier in seen_ids or seen_ids.add(client.machineIdentifier))
+            ]
+        else:
+            # A name-only overview skips the session request entirely
+            all_clients = await get_clients(plex)
         
         if not all_clients:
             return json.dumps({
@@ -51,19 +423,7 @@ async def client_list(include_details: bool = True) -> str:
         
         result = []
         if include_details:
-            for client in all_clients:
-                result.append({
-                    "name": client.title,
-                    "device": getattr(client, 'device', 'Unknown'),
-                    "model": getattr(client, "model", "Unknown"),
-                    "product": getattr(client, 'product', 'Unknown'),
-                    "version": getattr(client, 'version', 'Unknown'),
-                    "platform": getattr(client, "platform", "Unknown"),
-                    "state": getattr(client, "state", "Unknown"),
-                    "machineIdentifier": getattr(client, 'machineIdentifier', 'Unknown'),
-                    "address": getattr(client, "_baseurl", "Unknown") or getattr(client, "address", "Unknown"),
-                    "protocolCapabilities": getattr(client, "protocolCapabilities", [])
-                })
+            result = [_client_info(client, _CLIENT_LIST_FIELDS) for client in all_clients]
         else:
             result = [client.title for client in all_clients]
             
@@ -72,7 +432,7 @@ async def client_list(include_details: bool = True) -> str:
             "message": f"Found {len(all_clients)} connected clients",
             "count": len(all_clients),
             "clients": result
-        }, indent=2)
+        })
             
     except Exception as e:
         return json.dumps({
@@ -91,64 +451,22 @@ async def client_get_details(client_name: str) -> str:
         Dictionary containing client details
     """
     try:
-        plex = connect_to_plex()
+        plex = await get_plex()
         
-        # Get regular clients
-        regular_clients = plex.clients()
-        
-        # Also get clients from sessions
-        sessions = plex.sessions()
-        session_clients = []
-        
-        # Extract clients from sessions
-        for session in sessions:
-            if hasattr(session, 'player') and session.player:
-                session_clients.append(session.player)
-        
-        # Try to find the client first in regular clients
-        client = None
-        try:
-            client = plex.client(client_name)
-        except NotFound:
-            # Try to find a client with a matching name in regular clients
-            matching_clients = [c for c in regular_clients if client_name.lower() in c.title.lower()]
-            if matching_clients:
-                client = matching_clients[0]
-            else:
-                # Try to find in session clients
-                matching_session_clients = [c for c in session_clients if 
-                                           hasattr(c, 'title') and client_name.lower() in c.title.lower()]
-                if matching_session_clients:
-                    client = matching_session_clients[0]
-                else:
-                    return json.dumps({
-                        "status": "error",
-                        "message": f"No client found matching '{client_name}'"
-                    })
+        # Try to find the client first in regular clients, then in session clients
+        client = await _find_server_client(plex, client_name)
+        if client is None:
+            return json.dumps({
+                "status": "error",
+                "message": f"No client found matching '{client_name}'"
+            })
             
-        client_details = {
-            "name": client.title,
-            "device": getattr(client, 'device', 'Unknown'),
-            "deviceClass": getattr(client, "deviceClass", "Unknown"),
-            "model": getattr(client, "model", "Unknown"),
-            "product": getattr(client, 'product', 'Unknown'),
-            "version": getattr(client, 'version', 'Unknown'),
-            "platform": getattr(client, "platform", "Unknown"),
-            "platformVersion": getattr(client, "platformVersion", "Unknown"),
-            "state": getattr(client, "state", "Unknown"),
-            "machineIdentifier": getattr(client, 'machineIdentifier', 'Unknown'),
-            "protocolCapabilities": getattr(client, "protocolCapabilities", []),
-            "address": getattr(client, "_baseurl", "Unknown") or getattr(client, "address", "Unknown"),
-            "local": getattr(client, "local", "Unknown"),
-            "protocol": getattr(client, "protocol", "plex"),
-            "protocolVersion": getattr(client, "protocolVersion", "Unknown"),
-            "vendor": getattr(client, "vendor", "Unknown"),
-        }
+        client_details = _client_info(client, _CLIENT_DETAIL_FIELDS)
         
         return json.dumps({
             "status": "success",
             "client": client_details
-        }, indent=2)
+        })
             
     except Exception as e:
         return json.dumps({
@@ -167,133 +485,74 @@ async def client_get_timelines(client_name: str) -> str:
         Timeline information for the client
     """
     try:
-        plex = connect_to_plex()
-        
-        # Get regular clients
-        regular_clients = plex.clients()
-        
-        # Also get clients from sessions
-        sessions = plex.sessions()
-        session_clients = []
-        
-        # Extract clients from sessions
-        for session in sessions:
-            if hasattr(session, 'player') and session.player:
-                session_clients.append(session.player)
+        plex = await get_plex()
         
-        # Try to find the client first in regular clients
-        client = None
-        try:
-            client = plex.client(client_name)
-        except NotFound:
-            # Try to find a client with a matching name in regular clients
-            matching_clients = [c for c in regular_clients if client_name.lower() in c.title.lower()]
-            if matching_clients:
-                client = matching_clients[0]
-            else:
-                # Try to find in session clients
-                matching_session_clients = [c for c in session_clients if 
-                                           hasattr(c, 'title') and client_name.lower() in c.title.lower()]
-                if matching_session_clients:
-                    client = matching_session_clients[0]
-                else:
-                    return json.dumps({
-                        "status": "error",
-                        "message": f"No client found matching '{client_name}'"
-                    })
+        # Try to find the client first in regular clients, then in session clients
+        client = await _find_server_client(plex, client_name)
+        if client is None:
+            return json.dumps({
+                "status": "error",
+                "message": f"No client found matching '{client_name}'"
+            })
             
         # Some clients may not always respond to timeline requests
+        responded = True
         try:
-            timeline = client.timeline
+            timeline = await asyncio.to_thread(getattr, client, 'timeline')
+        except _TIMELINE_ERRORS:
+            timeline, responded = None, False
+        
+        # Without a timeline, fall back to the client's active session if it has one
+        if timeline is None:
+            session = _sessions_by_player(await get_sessions(plex)).get(client.machineIdentifier)
+            if session is not None:
+                return json.dumps({
+                    "status": "success",
+                    "client_name": client.title,
+                    "source": "session",
+                    "timeline": _session_timeline(session)
+                })
             
-            # If timeline is None, the client might not be actively playing anything
-            if timeline is None:
-                # Check if this client has an active session
-                for session in sessions:
-                    if (hasattr(session, 'player') and session.player and 
-                       hasattr(session.player, 'machineIdentifier') and 
-                       hasattr(client, 'machineIdentifier') and
-                       session.player.machineIdentifier == client.machineIdentifier):
-                        # Use session information instead
-                        session_data = {
-                            "state": session.player.state if hasattr(session.player, 'state') else "Unknown",
-                            "time": session.viewOffset if hasattr(session, 'viewOffset') else 0,
-                            "duration": session.duration if hasattr(session, 'duration') else 0,
-                            "progress": round((session.viewOffset / session.duration * 100) if hasattr(session, 'viewOffset') and 
-                                               hasattr(session, 'duration') and session.duration else 0, 2),
-                            "title": session.title if hasattr(session, 'title') else "Unknown",
-                            "type": session.type if hasattr(session, 'type') else "Unknown",
-                        }
-                        
-                        return json.dumps({
-                            "status": "success",
-                            "client_name": client.title,
-                            "source": "session",
-                            "timeline": session_data
-                        }, indent=2)
-                
+            if not responded:
                 return json.dumps({
-                    "status": "info",
-                    "message": f"Client '{client.title}' is not currently playing any media.",
+                    "status": "warning",
+                    "message": f"Unable to get timeline information for client '{client.title}'. The client may not be responding to timeline requests.",
                     "client_name": client.title
                 })
-                
-            # Process timeline data
-            timeline_data = {
-                "type": timeline.type,
-                "state": timeline.state,
-                "time": timeline.time,
-                "duration": timeline.duration,
-                "progress": round((timeline.time / timeline.duration * 100) if timeline.duration else 0, 2),
-                "key": getattr(timeline, "key", None),
-                "ratingKey": getattr(timeline, "ratingKey", None),
-                "playQueueItemID": getattr(timeline, "playQueueItemID", None),
-                "playbackRate": getattr(timeline, "playbackRate", 1),
-                "shuffled": getattr(timeline, "shuffled", False),
-                "repeated": getattr(timeline, "repeated", 0),
-                "muted": getattr(timeline, "muted", False),
-                "volume": getattr(timeline, "volume", None),
-                "title": getattr(timeline, "title", None),
-                "guid": getattr(timeline, "guid", None),
-            }
-            
-            return json.dumps({
-                "status": "success",
-                "client_name": client.title,
-                "source": "timeline",
-                "timeline": timeline_data
-            }, indent=2)
-        except:
-            # Check if there's an active session for this client
-            for session in sessions:
-                if (hasattr(session, 'player') and session.player and 
-                    hasattr(session.player, 'machineIdentifier') and 
-                    hasattr(client, 'machineIdentifier') and
-                    session.player.machineIdentifier == client.machineIdentifier):
-                    # Use session information instead
-                    session_data = {
-                        "state": session.player.state if hasattr(session.player, 'state') else "Unknown",
-                        "time": session.viewOffset if hasattr(session, 'viewOffset') else 0,
-                        "duration": session.duration if hasattr(session, 'duration') else 0,
-                        "progress": round((session.viewOffset / session.duration * 100) if hasattr(session, 'viewOffset') and 
-                                           hasattr(session, 'duration') and session.duration else 0, 2),
-                        "title": session.title if hasattr(session, 'title') else "Unknown",
-                        "type": session.type if hasattr(session, 'type') else "Unknown",
-                    }
-                    
-                    return json.dumps({
-                        "status": "success",
-                        "client_name": client.title,
-                        "source": "session",
-                        "timeline": session_data
-                    }, indent=2)
             
             return json.dumps({
-                "status": "warning",
-                "message": f"Unable to get timeline information for client '{client.title}'. The client may not be responding to timeline requests.",
+                "status": "info",
+                "message": f"Client '{client.title}' is not currently playing any media.",
                 "client_name": client.title
             })
             
+        # Process timeline data
+        position, duration = timeline.time, timeline.duration
+        timeline_data = {
+            "type": timeline.type,
+            "state": timeline.state,
+            "time": position,
+            "duration": duration,
+            "progress": round((position / duration * 100) if position and duration else 0, 2),
+            "key": getattr(timeline, "key", None),
+            "ratingKey": getattr(timeline, "ratingKey", None),
+            "playQueueItemID": getattr(timeline, "playQueueItemID", None),
+            "playbackRate": getattr(timeline, "playbackRate", 1),
+            "shuffled": getattr(timeline, "shuffled", False),
+            "repeated": getattr(timeline, "repeated", 0),
+            "muted": getattr(timeline, "muted", False),
+            "volume": getattr(timeline, "volume", None),
+            "title": getattr(timeline, "title", None),
+            "guid": getattr(timeline, "guid", None),
+        }
+        
+        return json.dumps({
+            "status": "success",
+            "client_name": client.title,
+            "source": "timeline",
+            "timeline": timeline_data
+        })
+            
     except Exception as e:
         return json.dumps({
             "status": "error",
@@ -308,10 +567,10 @@ async def client_get_active() -> str:
         List of active clients with their playback status
     """
     try:
-        plex = connect_to_plex()
+        plex = await get_plex()
         
         # Get all sessions
-        sessions = plex.sessions()
+        sessions = await get_sessions(plex)
         
         if not sessions:
             return json.dumps({
@@ -324,59 +583,58 @@ async def client_get_active() -> str:
         active_clients = []
         
         for session in sessions:
-            if hasattr(session, 'player') and session.player:
-                player = session.player
-                
-                # Get media information
-                media_info = {
-                    "title": session.title if hasattr(session, 'title') else "Unknown",
-                    "type": session.type if hasattr(session, 'type') else "Unknown",
-                }
-                
-                # Add additional info based on media type
-                if hasattr(session, 'type'):
-                    if session.type == 'episode':
-                        media_info["show"] = getattr(session, 'grandparentTitle', 'Unknown Show')
-                        media_info["season"] = getattr(session, 'parentTitle', 'Unknown Season')
-                        media_info["seasonEpisode"] = f"S{getattr(session, 'parentIndex', '?')}E{getattr(session, 'index', '?')}"
-                    elif session.type == 'movie':
-                        media_info["year"] = getattr(session, 'year', 'Unknown')
-                
-                # Calculate progress if possible
-                progress = None
-                if hasattr(session, 'viewOffset') and hasattr(session, 'duration') and session.duration:
-                    progress = round((session.viewOffset / session.duration) * 100, 1)
-                
-                # Get user info
-                username = "Unknown User"
-                if hasattr(session, 'usernames') and session.usernames:
-                    username = session.usernames[0]
-                
-                # Get transcoding status
-                transcoding = False
-                if hasattr(session, 'transcodeSessions') and session.transcodeSessions:
-                    transcoding = True
-                
-                client_info = {
-                    "name": player.title,
-                    "device": getattr(player, 'device', 'Unknown'),
-                    "product": getattr(player, 'product', 'Unknown'),
-                    "platform": getattr(player, 'platform', 'Unknown'),
-                    "state": getattr(player, 'state', 'Unknown'),
-                    "user": username,
-                    "media": media_info,
-                    "progress": progress,
-                    "transcoding": transcoding
-                }
-                
-                active_clients.append(client_info)
+            # Bind the player once; sessions without one aren't tied to a client
+            player = getattr(session, 'player', None)
+            if not player:
+                continue
+            
+            media_type = getattr(session, 'type', "Unknown")
+            
+            # Get media information
+            media_info = {
+                "title": getattr(session, 'title', "Unknown"),
+                "type": media_type,
+            }
+            
+            # Add additional info based on media type
+            if media_type == 'episode':
+                media_info["show"] = getattr(session, 'grandparentTitle', 'Unknown Show')
+                media_info["season"] = getattr(session, 'parentTitle', 'Unknown Season')
+                media_info["seasonEpisode"] = f"S{getattr(session, 'parentIndex', '?')}E{getattr(session, 'index', '?')}"
+            elif media_type == 'movie':
+                media_info["year"] = getattr(session, 'year', 'Unknown')
+            
+            # Calculate progress if possible
+            view_offset = getattr(session, 'viewOffset', None)
+            duration = getattr(session, 'duration', None)
+            progress = None
+            if view_offset is not None and duration:
+                progress = round((view_offset / duration) * 100, 1)
+            
+            # Get user info
+            usernames = getattr(session, 'usernames', None)
+            username = usernames[0] if usernames else "Unknown User"
+            
+            # Get transcoding status
+            transcoding = bool(getattr(session, 'transcodeSessions', None))
+            
+            client_info = {
+                "name": player.title,
+                **_client_fields(player, _ACTIVE_PLAYER_FIELDS),
+                "user": username,
+                "media": media_info,
+                "progress": progress,
+                "transcoding": transcoding
+            }
+            
+            active_clients.append(client_info)
         
         return json.dumps({
             "status": "success",
             "message": f"Found {len(active_clients)} active clients",
             "count": len(active_clients),
             "active_clients": active_clients
-        }, indent=2)
+        })
         
     except Exception as e:
         return json.dumps({
@@ -398,7 +656,7 @@ async def client_start_playback(media_title: str, client_name: str = None,
         use_external_player: Whether to use the client's external player
     """
     try:
-        plex = connect_to_plex()
+        plex = await get_plex()
         
         # First, find the media item
         results = []
@@ -452,13 +710,13 @@ async def client_start_playback(media_title: str, client_name: str = None,
                 "message": f"Multiple items found matching '{media_title}'. Please specify a library or use a more specific title.",
                 "count": len(results),
                 "results": media_list
-            }, indent=2)
+            })
         
         media = results[0]
         
         # If no client name specified, list available clients
         if not client_name:
-            clients = plex.clients()
+            clients = await get_clients(plex)
             
             if not clients:
                 return json.dumps({
@@ -478,21 +736,15 @@ async def client_start_playback(media_title: str, client_name: str = None,
                 "status": "client_selection",
                 "message": "Please specify a client to play on using the client_name parameter",
                 "available_clients": client_list
-            }, indent=2)
+            })
         
         # Try to find the client
-        try:
-            client = plex.client(client_name)
-        except NotFound:
-            # Try to find a client with a matching name
-            matching_clients = [c for c in plex.clients() if client_name.lower() in c.title.lower()]
-            if matching_clients:
-                client = matching_clients[0]
-            else:
-                return json.dumps({
-                    "status": "error",
-                    "message": f"No client found matching '{client_name}'"
-                })
+        client = _find_client(client_name, await get_clients(plex))
+        if client is None:
+            return json.dumps({
+                "status": "error",
+                "message": f"No client found matching '{client_name}'"
+            })
         
         # Start playback
         media_type = getattr(media, 'type', 'unknown')
@@ -520,6 +772,7 @@ async def client_start_playback(media_title: str, client_name: str = None,
             else:
                 # Normal playback
                 client.playMedia(media, offset=offset)
+            invalidate_client_cache()
             
             return json.dumps({
                 "status": "success",
@@ -532,7 +785,7 @@ async def client_start_playback(media_title: str, client_name: str = None,
                 },
                 "client": client.title,
                 "offset": offset
-            }, indent=2)
+            })
         except Exception as e:
             return json.dumps({
                 "status": "error",
@@ -547,7 +800,8 @@ async def client_start_playback(media_title: str, client_name: str = None,
 
 @mcp.tool()
 async def client_control_playback(client_name: str, action: str, 
-                         parameter: int = None, media_type: str = 'video') -> str:
+                         parameter: int = None, media_type: str = 'video',
+                         include_timeline: bool = True) -> str:
     """Control playback on a specified client.
     
     Args:
@@ -556,52 +810,44 @@ async def client_control_playback(client_name: str, action: str,
                 stepForward, stepBack, seekTo, seekForward, seekBack, mute, unmute, setVolume)
         parameter: Parameter for actions that require it (like setVolume or seekTo)
         media_type: Type of media being controlled ('video', 'music', or 'photo')
+        include_timeline: Whether to wait for the client to confirm the action
+            and return its updated timeline
     """
     try:
-        plex = connect_to_plex()
-        
-        # Validate action
-        valid_actions = [
-            'play', 'pause', 'stop', 'skipNext', 'skipPrevious', 
-            'stepForward', 'stepBack', 'seekTo', 'seekForward', 'seekBack',
-            'mute', 'unmute', 'setVolume'
-        ]
-        
-        if action not in valid_actions:
+        # Validate the arguments before connecting, so bad calls fail fast
+        if action not in _PLAYBACK_DISPATCH:
             return json.dumps({
                 "status": "error",
-                "message": f"Invalid action '{action}'. Valid actions are: {', '.join(valid_actions)}"
+                "message": f"Invalid action '{action}'. Valid actions are: {_PLAYBACK_ACTIONS_STR}"
             })
         
         # Check if parameter is needed but not provided
-        actions_needing_parameter = ['seekTo', 'setVolume']
-        if action in actions_needing_parameter and parameter is None:
+        if action in _ACTIONS_NEEDING_PARAMETER and parameter is None:
             return json.dumps({
                 "status": "error",
                 "message": f"Action '{action}' requires a parameter value."
             })
             
         # Validate media type
-        valid_media_types = ['video', 'music', 'photo']
-        if media_type not in valid_media_types:
+        if media_type not in _VALID_MEDIA_TYPES:
             return json.dumps({
                 "status": "error",
-                "message": f"Invalid media type '{media_type}'. Valid types are: {', '.join(valid_media_types)}"
+                "message": f"Invalid media type '{media_type}'. Valid types are: {_VALID_MEDIA_TYPES_STR}"
             })
         
+        # Volume must be 0-100
+        if action == 'setVolume' and not 0 <= parameter <= 100:
+            return _ERR_VOLUME_RANGE
+        
+        plex = await get_plex()
+        
         # Try to find the client
-        try:
-            client = plex.client(client_name)
-        except NotFound:
-            # Try to find a client with a matching name
-            matching_clients = [c for c in plex.clients() if client_name.lower() in c.title.lower()]
-            if matching_clients:
-                client = matching_clients[0]
-            else:
-                return json.dumps({
-                    "status": "error",
-                    "message": f"No client found matching '{client_name}'"
-                })
+        client = _find_client(client_name, await get_clients(plex))
+        if client is None:
+            return json.dumps({
+                "status": "error",
+                "message": f"No client found matching '{client_name}'"
+            })
         
         # Check if the client has playback control capability
         if "playback" not in client.protocolCapabilities:
@@ -612,69 +858,35 @@ async def client_control_playback(client_name: str, action: str,
         
         # Perform the requested action
         try:
-            # Transport controls
-            if action == 'play':
-                client.play()
-            elif action == 'pause':
-                client.pause()
-            elif action == 'stop':
-                client.stop()
-            elif action == 'skipNext':
-                client.skipNext()
-            elif action == 'skipPrevious':
-                client.skipPrevious()
-            elif action == 'stepForward':
-                client.stepForward()
-            elif action == 'stepBack':
-                client.stepBack()
+            # Snapshot the timeline before the command: skips are confirmed
+            # against its item, and an action it already reflects (e.g. play
+            # while playing) says nothing about the client's latency
+            before, have_before = None, False
+            if include_timeline and action in _CONFIRMABLE_ACTIONS:
+                try:
+                    before, have_before = await asyncio.to_thread(_poll_timeline, client), True
+                except _TIMELINE_ERRORS:
+                    pass
             
-            # Seeking
-            elif action == 'seekTo':
-                # Parameter should be milliseconds
-                client.seekTo(parameter)
-            elif action == 'seekForward':
-                # Default to 30 seconds if no parameter
-                seconds = parameter if parameter is not None else 30
-                client.seekTo(client.timeline.time + (seconds * 1000))
-            elif action == 'seekBack':
-                # Default to 30 seconds if no parameter
-                seconds = parameter if parameter is not None else 30
-                seek_time = max(0, client.timeline.time - (seconds * 1000))
-                client.seekTo(seek_time)
+            # Client commands are blocking HTTP requests, so send them off the event loop
+            target_time = await asyncio.to_thread(_PLAYBACK_DISPATCH[action], client, parameter)
+            invalidate_client_cache()
             
-            # Volume controls
-            elif action == 'mute':
-                client.mute()
-            elif action == 'unmute':
-                client.unmute()
-            elif action == 'setVolume':
-                # Parameter should be 0-100
-                if parameter < 0 or parameter > 100:
-                    return json.dumps({
-                        "status": "error",
-                        "message": "Volume must be between 0 and 100"
-                    })
-                client.setVolume(parameter)
-            
-            # Check timeline to confirm the action (may take a moment to update)
-            time.sleep(0.5)  # Give a short delay for state to update
-            
-            # Get updated timeline info
+            # Wait for the timeline to confirm the action (may take a moment to update)
             timeline = None
-            try:
-                timeline = client.timeline
-                if timeline:
-                    timeline_data = {
-                        "state": timeline.state,
-                        "time": timeline.time,
-                        "duration": timeline.duration,
-                        "volume": getattr(timeline, "volume", None),
-                        "muted": getattr(timeline, "muted", None)
-                    }
-                else:
-                    timeline_data = None
-            except:
-                timeline_data = None
+            if include_timeline:
+                confirmed = _action_confirmation(action, parameter, target_time, before)
+                measure = have_before and confirmed is not None and not confirmed(before)
+                timeline = await _await_state_change(client, confirmed, measure)
+            timeline_data = None
+            if timeline:
+                timeline_data = {
+                    "state": timeline.state,
+                    "time": timeline.time,
+                    "duration": timeline.duration,
+                    "volume": getattr(timeline, "volume", None),
+                    "muted": getattr(timeline, "muted", None)
+                }
             
             return json.dumps({
                 "status": "success",
@@ -683,7 +895,7 @@ async def client_control_playback(client_name: str, action: str,
                 "client": client.title,
                 "parameter": parameter,
                 "timeline": timeline_data
-            }, indent=2)
+            })
             
         except Exception as e:
             return json.dumps({
@@ -707,33 +919,22 @@ async def client_navigate(client_name: str, action: str) -> str:
                 select, back, home, contextMenu)
     """
     try:
-        plex = connect_to_plex()
-        
-        # Validate action
-        valid_actions = [
-            'moveUp', 'moveDown', 'moveLeft', 'moveRight',
-            'select', 'back', 'home', 'contextMenu'
-        ]
-        
-        if action not in valid_actions:
+        # Validate action before connecting, so bad calls fail fast
+        if action not in _NAV_DISPATCH:
             return json.dumps({
                 "status": "error",
-                "message": f"Invalid navigation action '{action}'. Valid actions are: {', '.join(valid_actions)}"
+                "message": f"Invalid navigation action '{action}'. Valid actions are: {_NAV_ACTIONS_STR}"
             })
         
+        plex = await get_plex()
+        
         # Try to find the client
-        try:
-            client = plex.client(client_name)
-        except NotFound:
-            # Try to find a client with a matching name
-            matching_clients = [c for c in plex.clients() if client_name.lower() in c.title.lower()]
-            if matching_clients:
-                client = matching_clients[0]
-            else:
-                return json.dumps({
-                    "status": "error",
-                    "message": f"No client found matching '{client_name}'"
-                })
+        client = _find_client(client_name, await get_clients(plex))
+        if client is None:
+            return json.dumps({
+                "status": "error",
+                "message": f"No client found matching '{client_name}'"
+            })
         
         # Check if the client has navigation capability
         if "navigation" not in client.protocolCapabilities:
@@ -744,29 +945,14 @@ async def client_navigate(client_name: str, action: str) -> str:
         
         # Perform the requested action
         try:
-            if action == 'moveUp':
-                client.moveUp()
-            elif action == 'moveDown':
-                client.moveDown()
-            elif action == 'moveLeft':
-                client.moveLeft()
-            elif action == 'moveRight':
-                client.moveRight()
-            elif action == 'select':
-                client.select()
-            elif action == 'back':
-                client.goBack()
-            elif action == 'home':
-                client.goToHome()
-            elif action == 'contextMenu':
-                client.contextMenu()
+            await asyncio.to_thread(_NAV_DISPATCH[action], client)
             
             return json.dumps({
                 "status": "success",
                 "message": f"Successfully performed navigation action '{action}' on client '{client.title}'",
                 "action": action,
                 "client": client.title
-            }, indent=2)
+            })
             
         except Exception as e:
             return json.dumps({
@@ -792,82 +978,58 @@ async def client_set_streams(client_name: str, audio_stream_id: str = None,
         video_stream_id: ID of the video stream to switch to
     """
     try:
-        plex = connect_to_plex()
-        
-        # Check if at least one stream ID is provided
+        # Check if at least one stream ID is provided before connecting
         if audio_stream_id is None and subtitle_stream_id is None and video_stream_id is None:
+            return _ERR_NO_STREAM_IDS
+        
+        plex = await get_plex()
+        
+        # Try to find the client
+        client = _find_client(client_name, await get_clients(plex))
+        if client is None:
             return json.dumps({
                 "status": "error",
-                "message": "At least one stream ID (audio, subtitle, or video) must be provided."
+                "message": f"No client found matching '{client_name}'"
             })
         
-        # Try to find the client
-        try:
-            client = plex.client(client_name)
-        except NotFound:
-            # Try to find a client with a matching name
-            matching_clients = [c for c in plex.clients() if client_name.lower() in c.title.lower()]
-            if matching_clients:
-                client = matching_clients[0]
-            else:
-                return json.dumps({
-                    "status": "error",
-                    "message": f"No client found matching '{client_name}'"
-                })
-        
         # Check if client is currently playing
-        timeline = None
         try:
-            timeline = client.timeline
-            if timeline is None or not hasattr(timeline, 'state') or timeline.state != 'playing':
-                # Check active sessions to see if this client has a session
-                sessions = plex.sessions()
-                client_session = None
-                
-                for session in sessions:
-                    if (hasattr(session, 'player') and session.player and 
-                        hasattr(session.player, 'machineIdentifier') and 
-                        hasattr(client, 'machineIdentifier') and
-                        session.player.machineIdentifier == client.machineIdentifier):
-                        client_session = session
-                        break
-                
-                if not client_session:
-                    return json.dumps({
-                        "status": "error",
-                        "message": f"Client '{client.title}' is not currently playing any media."
-                    })
-        except:
+            active = await _is_client_active(plex, client)
+        except Exception:
             return json.dumps({
                 "status": "error",
                 "message": f"Unable to get playback status for client '{client.title}'."
             })
+        if not active:
+            return json.dumps({
+                "status": "error",
+                "message": f"Client '{client.title}' is not currently playing any media."
+            })
         
-        # Set streams
-        changed_streams = []
+        # Set streams; setStreams sends every change in one command, off the event loop
+        changed_streams = [
+            f"{kind} to {stream_id}"
+            for kind, stream_id in (("audio", audio_stream_id), ("subtitle", subtitle_stream_id), ("video", video_stream_id))
+            if stream_id is not None
+        ]
         try:
-            if audio_stream_id is not None:
-                client.setAudioStream(audio_stream_id)
-                changed_streams.append(f"audio to {audio_stream_id}")
-            
-            if subtitle_stream_id is not None:
-                client.setSubtitleStream(subtitle_stream_id)
-                changed_streams.append(f"subtitle to {subtitle_stream_id}")
-            
-            if video_stream_id is not None:
-                client.setVideoStream(video_stream_id)
-                changed_streams.append(f"video to {video_stream_id}")
+            await asyncio.to_thread(
+                client.setStreams,
+                audioStreamID=audio_stream_id,
+                subtitleStreamID=subtitle_stream_id,
+                videoStreamID=video_stream_id
+            )
             
             return json.dumps({
                 "status": "success",
                 "message": f"Successfully set streams for '{client.title}': {', '.join(changed_streams)}",
                 "client": client.title,
                 "changes": {
-                    "audio_stream": audio_stream_id if audio_stream_id is not None else None,
-                    "subtitle_stream": subtitle_stream_id if subtitle_stream_id is not None else None,
-                    "video_stream": video_stream_id if video_stream_id is not None else None
+                    "audio_stream": audio_stream_id,
+                    "subtitle_stream": subtitle_stream_id,
+                    "video_stream": video_stream_id
                 }
-            }, indent=2)
+            })
         except Exception as e:
             return json.dumps({
                 "status": "error",
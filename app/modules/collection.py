@@ -1,8 +1,6 @@
-from plexapi.collection import Collection # type: ignore
 from typing import List, Dict, Any
 from app.modules import mcp, connect_to_plex
-import os
-from plexapi.exceptions import NotFound, BadRequest  # type: ignore
+from plexapi.exceptions import NotFound  # type: ignore
 import json
 
 @mcp.tool()
@@ -1,11 +1,9 @@
 import json
-import requests
 import aiohttp
 import asyncio
 from plexapi.exceptions import NotFound # type: ignore
-from app.modules import mcp, connect_to_plex
+from app.modules import mcp, connect_to_plex, ttl_cache
 from urllib.parse import urljoin
-import time
 
 def get_plex_headers(plex):
     """Get standard Plex headers for HTTP requests"""
@@ -19,27 +17,32 @@ async def async_get_json(session, url, headers):
     async with session.get(url, headers=headers) as response:
         return await response.json()
 
+@ttl_cache(60)
+async def get_libraries() -> dict:
+    """Fetch a summary of every library section, cached for a minute since sections rarely change."""
+    plex = connect_to_plex()
+    
+    libraries_dict = {}
+    for lib in plex.library.sections():
+        libraries_dict[lib.title] = {
+            "type": lib.type,
+            "libraryId": lib.key,
+            "totalSize": lib.totalSize,
+            "uuid": lib.uuid,
+            "locations": lib.locations,
+            "updatedAt": lib.updatedAt.isoformat()
+        }
+    return libraries_dict
+
 @mcp.tool()
 async def library_list() -> str:
     """List all available libraries on the Plex server."""
     try:
-        plex = connect_to_plex()
-        libraries = plex.library.sections()
+        libraries_dict = await get_libraries()
         
-        if not libraries:
+        if not libraries_dict:
             return json.dumps({"message": "No libraries found on your Plex server."})
         
-        libraries_dict = {}
-        for lib in libraries:
-            libraries_dict[lib.title] = {
-                "type": lib.type,
-                "libraryId": lib.key,
-                "totalSize": lib.totalSize,
-                "uuid": lib.uuid,
-                "locations": lib.locations,
-                "updatedAt": lib.updatedAt.isoformat()
-            }
-        
         return json.dumps(libraries_dict)
     except Exception as e:
         return json.dumps({"error": f"Error listing libraries: {str(e)}"})
@@ -313,10 +316,12 @@ async def library_refresh(library_name: str = None) -> str:
             
             # Refresh the library
             section.refresh()
+            get_libraries.cache_clear()
             return json.dumps({"success": True, "message": f"Refreshing library '{section.title}'. This may take some time."})
         else:
             # Refresh all libraries
             plex.library.refresh()
+            get_libraries.cache_clear()
             return json.dumps({"success": True, "message": "Refreshing all libraries. This may take some time."})
     except Exception as e:
         return json.dumps({"error": f"Error refreshing library: {str(e)}"})
@@ -349,11 +354,13 @@ async def library_scan(library_name: str, path: str = None) -> str:
         if path:
             try:
                 section.update(path=path)
+                get_libraries.cache_clear()
                 return json.dumps({"success": True, "message": f"Scanning path '{path}' in library '{section.title}'. This may take some time."})
             except NotFound:
                 return json.dumps({"error": f"Path '{path}' not found in library '{section.title}'."})
         else:
             section.update()
+            get_libraries.cache_clear()
             return json.dumps({"success": True, "message": f"Scanning library '{section.title}'. This may take some time."})
     except Exception as e:
         return json.dumps({"error": f"Error scanning library: {str(e)}"})
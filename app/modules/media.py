@@ -1,7 +1,6 @@
 from app.modules import mcp, connect_to_plex
 from typing import List
 from plexapi.exceptions import NotFound # type: ignore
-import base64
 import os
 import json
 
@@ -15,7 +14,7 @@ async def media_search(query: str, content_type: str = None) -> str:
     """
     try:
         import requests
-        from urllib.parse import quote, urlencode
+        from urllib.parse import urlencode
 
         # Get Plex URL and token from environment
         plex_url = os.environ.get("PLEX_URL", "").rstrip('/')
@@ -1,10 +1,8 @@
 from app.modules import mcp, connect_to_plex
 from typing import List
-from plexapi.playlist import Playlist # type: ignore
-from plexapi.exceptions import NotFound, BadRequest  # type: ignore
+from plexapi.exceptions import NotFound  # type: ignore
 import os
 import requests
-import base64
 import json
 
 # Functions for playlists and collections
@@ -744,7 +742,6 @@ async def playlist_get_contents(playlist_title: str = None, playlist_id: int = N
                 # Try fetching by ratingKey first
                 try:
                     playlist = plex.fetchItem(playlist_id)
-                    print(playlist.items())
                 except:
                     # If that fails, try finding by key in all playlists
                     all_playlists = plex.playlists()
@@ -754,7 +751,6 @@ async def playlist_get_contents(playlist_title: str = None, playlist_id: int = N
                     return json.dumps({"error": f"Playlist with ID '{playlist_id}' not found"}, indent=4)
                 
                 # Get playlist contents
-                print(playlist)
                 return get_playlist_contents(playlist)
             except Exception as e:
                 if "500" in str(e):
@@ -792,7 +788,6 @@ async def playlist_get_contents(playlist_title: str = None, playlist_id: int = N
 
 def get_playlist_contents(playlist):
     """Helper function to get formatted playlist contents."""
-    print(playlist)
     try:
         items = playlist.items()
         playlist_items = []
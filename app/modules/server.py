@@ -1,8 +1,8 @@
 from app.modules import mcp, connect_to_plex
 import os
-from typing import Dict, List, Any, Optional
 import json
 import asyncio
+import sys
 import requests
 
 @mcp.tool()
@@ -16,9 +16,6 @@ async def server_get_plex_logs(num_lines: int = 100, log_type: str = "server") -
     try:
         import zipfile
         import io
-        import tempfile
-        import os
-        import shutil
         import traceback
         
         plex = connect_to_plex()
@@ -242,7 +239,6 @@ async def server_get_butler_tasks() -> str:
         if response.status_code == 200:
             # Parse the XML response
             import xml.etree.ElementTree as ET
-            from xml.dom import minidom
             
             try:
                 # Try to parse as XML first
@@ -306,7 +302,7 @@ async def server_get_alerts(timeout: int = 15) -> str:
         # Define callback function to process alerts
         def alert_callback(data):
             # Print the raw data to help with debugging
-            print(f"Raw alert data received: {data}")
+            print(f"Raw alert data received: {data}", file=sys.stderr)
             
             try:
                 # Extract alert information from the raw notification data
@@ -320,7 +316,7 @@ async def server_get_alerts(timeout: int = 15) -> str:
                 alert_text = f"ALERT: {alert_type} - {alert_title} - {alert_description}"
                 
                 # Print to console in real-time
-                print(alert_text)
+                print(alert_text, file=sys.stderr)
                 
                 # Store alert info for JSON response
                 alert_info = {
@@ -332,14 +328,14 @@ async def server_get_alerts(timeout: int = 15) -> str:
                 }
                 alerts_data.append(alert_info)
             except Exception as e:
-                print(f"Error processing alert data: {e}")
+                print(f"Error processing alert data: {e}", file=sys.stderr)
                 # Still try to store some information even if processing fails
                 alerts_data.append({
                     "error": str(e),
                     "raw_data": str(data)
                 })
         
-        print(f"Starting alert listener for {timeout} seconds...")
+        print(f"Starting alert listener for {timeout} seconds...", file=sys.stderr)
         
         # Start the alert listener
         listener = plex.startAlertListener(alert_callback)
@@ -349,7 +345,7 @@ async def server_get_alerts(timeout: int = 15) -> str:
         
         # Stop the listener
         listener.stop()
-        print(f"Alert listener stopped after {timeout} seconds.")
+        print(f"Alert listener stopped after {timeout} seconds.", file=sys.stderr)
         
         # Format alerts as JSON
         return json.dumps({"status": "success", "data": alerts_data}, indent=4)
@@ -386,11 +382,11 @@ async def server_run_butler_task(task_name: str) -> str:
         # Disable SSL verification if using https
         verify = False if base_url.startswith('https') else True
         
-        print(f"Running butler task: {task_name}")
+        print(f"Running butler task: {task_name}", file=sys.stderr)
         response = requests.post(url, headers=headers, verify=verify)
         
-        print(f"Response status: {response.status_code}")
-        print(f"Response text: {response.text}")
+        print(f"Response status: {response.status_code}", file=sys.stderr)
+        print(f"Response text: {response.text}", file=sys.stderr)
         
         # Add 202 Accepted to the list of successful status codes
         if response.status_code in [200, 201, 202, 204]:
@@ -1,5 +1,4 @@
 import json
-from typing import Optional
 from app.modules import mcp, connect_to_plex
 
 # Functions for sessions and playback
@@ -4,18 +4,11 @@ import os
 import json
 import time
 import requests
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union
+from datetime import datetime
+from typing import Dict, Any
 
-try:
-    from dotenv import load_dotenv # type: ignore
-    # Load environment variables from .env file
-    load_dotenv()
-    PLEX_USERNAME = os.environ.get("PLEX_USERNAME", None)
-    print("Successfully loaded environment variables from .env file")
-except ImportError:
-    print("Warning: python-dotenv not installed. Environment variables won't be loaded from .env file.")
-    print("Install with: pip install python-dotenv")
+# The .env file has already been loaded by app.modules
+PLEX_USERNAME = os.environ.get("PLEX_USERNAME", None)
 
 @mcp.tool()
 async def user_search_users(search_term: str = None) -> str:
@@ -236,7 +229,7 @@ async def user_get_on_deck(username: str = PLEX_USERNAME) -> str:
                 if not user_token:
                     return json.dumps({"error": f"Unable to access on-deck items for user '{username}'. Token not available."})
                 
-                user_plex = PlexServer(plex._baseurl, user_token)
+                user_plex = PlexServer(plex._baseurl, user_token, session=plex._session)
                 on_deck_items = user_plex.library.onDeck()
             except Exception as user_err:
                 return json.dumps({"error": f"Error accessing user '{username}': {str(user_err)}"})